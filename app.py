@@ -1,178 +1,185 @@
 import json
-from dataclasses import dataclass
-from datetime import datetime, date as _date, time as _time
-from typing import Any, Dict, List, Tuple
+from datetime import datetime, tzinfo, date as _date, time as _time
+from typing import Any, Dict, List, NamedTuple, Tuple
 from collections import Counter
+from functools import lru_cache
 
-import pytz
 import streamlit as st
-from lunar_python import Solar
+
+from bazi_tables import (
+    ALL_TEN_GODS, BAND_0_1_2_3PLUS, BAND_0_1_2PLUS, GAN_CHARS, GAN_ID, GAN_WUXING,
+    RISK_MEDIUM_MARGIN, STABILIZING_TEN_GODS, TEN_GOD_TABLE, TENSION_TEN_GODS,
+    WUXING_BAND, WUXING_ORDER, ZHI_CANGGAN, ZHI_CHARS, ZHI_ID,
+)
+
+try:
+    import orjson  # 可选：更快的 JSON 编码
+except ImportError:
+    orjson = None
+
+# 页面配置放在最前，先于任何其他 Streamlit 命令执行
+st.set_page_config(page_title="Bazi Algorithmic Model Demo", layout="wide")
 
 
 # =========================
 # 1) 四柱计算
 # =========================
-@dataclass(frozen=True)
-class Pillars:
+class Pillars(NamedTuple):
     year_gz: str
     month_gz: str
     day_gz: str
     hour_gz: str
     day_master: str  # 日干
+    # 热路径只用整数编号（见 GAN_ID / ZHI_ID），汉字仅用于输出
+    day_master_id: int
+    gan_ids: Tuple[int, int, int, int]  # 年/月/日/时 天干
+    zhi_ids: Tuple[int, int, int, int]  # 年/月/日/时 地支
+
+
+# 四柱只取决于本地墙钟时间（Solar.fromYmdHms 不看时区），按原始整数字段缓存。
+# 结果为不可变元组，lru_cache 命中时直接返回，无需 st.cache_data 的哈希与 pickle。
+@lru_cache(maxsize=4096)
+def _lunar_gz(year: int, month: int, day: int,
+              hour: int, minute: int, second: int) -> Tuple[str, str, str, str]:
+    # 延迟导入：首屏渲染不加载 lunar_python，首次 Run 时才导入
+    from lunar_python import Solar
+
+    lunar = Solar.fromYmdHms(year, month, day, hour, minute, second).getLunar()
+    return (
+        lunar.getYearInGanZhi(),
+        lunar.getMonthInGanZhi(),
+        lunar.getDayInGanZhi(),
+        lunar.getTimeInGanZhi(),
+    )
 
 
-def get_pillars(dt_local: datetime) -> Pillars:
-    solar = Solar.fromYmdHms(
-        dt_local.year, dt_local.month, dt_local.day,
-        dt_local.hour, dt_local.minute, dt_local.second
-    )
-    lunar = solar.getLunar()
-    year_gz = lunar.getYearInGanZhi()
-    month_gz = lunar.getMonthInGanZhi()
-    day_gz = lunar.getDayInGanZhi()
-    hour_gz = lunar.getTimeInGanZhi()
-    return Pillars(year_gz, month_gz, day_gz, hour_gz, day_gz[0])
+def get_pillars(year: int, month: int, day: int,
+                hour: int, minute: int, second: int) -> Pillars:
+    gz = _lunar_gz(year, month, day, hour, minute, second)
+    gan_ids = tuple(GAN_ID[x[0]] for x in gz)
+    zhi_ids = tuple(ZHI_ID[x[1]] for x in gz)
+    dm = gan_ids[2]
+    return Pillars(*gz, GAN_CHARS[dm], dm, gan_ids, zhi_ids)
 
 
 # =========================
 # 2) 特征提取（五行/十神/藏干）
 # =========================
-GAN_WUXING = {
-    "甲": "木", "乙": "木",
-    "丙": "火", "丁": "火",
-    "戊": "土", "己": "土",
-    "庚": "金", "辛": "金",
-    "壬": "水", "癸": "水",
-}
-YIN_YANG = {
-    "甲": "阳", "乙": "阴",
-    "丙": "阳", "丁": "阴",
-    "戊": "阳", "己": "阴",
-    "庚": "阳", "辛": "阴",
-    "壬": "阳", "癸": "阴",
-}
-SHENG = {"木": "火", "火": "土", "土": "金", "金": "水", "水": "木"}
-KE    = {"木": "土", "土": "水", "水": "火", "火": "金", "金": "木"}
-
-ZHI_CANGGAN = {
-    "子": ["癸"], "丑": ["己", "癸", "辛"], "寅": ["甲", "丙", "戊"], "卯": ["乙"],
-    "辰": ["戊", "乙", "癸"], "巳": ["丙", "戊", "庚"], "午": ["丁", "己"],
-    "未": ["己", "丁", "乙"], "申": ["庚", "壬", "戊"], "酉": ["辛"],
-    "戌": ["戊", "辛", "丁"], "亥": ["壬", "甲"],
-}
+# 干支、十神与区间阈值取自 bazi_tables，与 bazi_kernel 共用同一份表
+
+# 五行编号（0–4），计数用定长列表，输出时再转回汉字键
+WX_ID = {e: i for i, e in enumerate(WUXING_ORDER)}
+GAN_WX_ID = tuple(WX_ID[GAN_WUXING[g]] for g in GAN_CHARS)
+# 每个地支所含藏干的五行编号（下标 zhi_id）
+ZHI_CG_WX_IDS = tuple(tuple(WX_ID[GAN_WUXING[cg]] for cg in ZHI_CANGGAN[z]) for z in ZHI_CHARS)
+
+# 天干位置上日干自身记为“日主”；按日干分行：[dm_id][og_id]
+GAN_TEN_GOD_WITH_SELF: Tuple[Tuple[str, ...], ...] = tuple(
+    tuple("日主" if dm == og else TEN_GOD_TABLE[(dm, og)] for og in GAN_CHARS)
+    for dm in GAN_CHARS
+)
+
+
+# (日干, 地支) -> 藏干十神三元组，按日干分行：[dm_id][zhi_id]，在导入时打表
+ZHI_CG_TG: Tuple[Tuple[Tuple[Tuple[str, str, str], ...], ...], ...] = tuple(
+    tuple(
+        tuple((z, cg, TEN_GOD_TABLE[(dm, cg)]) for cg in ZHI_CANGGAN[z])
+        for z in ZHI_CHARS
+    )
+    for dm in GAN_CHARS
+)
 
 
-def ten_god(day_master: str, other_gan: str) -> str:
-    dm_wx = GAN_WUXING[day_master]
-    ot_wx = GAN_WUXING[other_gan]
-    same_polar = (YIN_YANG[day_master] == YIN_YANG[other_gan])
+GAN_LABELS = ("年干", "月干", "日干", "时干")
 
-    if ot_wx == dm_wx:
-        return "比肩" if same_polar else "劫财"
-    if SHENG[dm_wx] == ot_wx:
-        return "食神" if same_polar else "伤官"
-    if KE[dm_wx] == ot_wx:
-        return "偏财" if same_polar else "正财"
-    if KE[ot_wx] == dm_wx:
-        return "七杀" if same_polar else "正官"
-    if SHENG[ot_wx] == dm_wx:
-        return "偏印" if same_polar else "正印"
-    return "未知"
+# 写入结果 JSON 的特征字段；其余计数仅供规则与风险评估内部共用
+EXPORTED_FEATURE_KEYS = ("wuxing_counts", "ten_gods_gan", "canggan_ten_gods")
 
 
 def extract_features(p: Pillars) -> Dict[str, Any]:
-    gans = [p.year_gz[0], p.month_gz[0], p.day_gz[0], p.hour_gz[0]]
-    zhis = [p.year_gz[1], p.month_gz[1], p.day_gz[1], p.hour_gz[1]]
+    # 取出当前日干对应的一行表，循环内只剩按编号取值
+    gan_tg = GAN_TEN_GOD_WITH_SELF[p.day_master_id]
+    zhi_cg_tg = ZHI_CG_TG[p.day_master_id]
 
-    wuxing_counts = {k: 0 for k in ["木", "火", "土", "金", "水"]}
-    for g in gans:
-        wuxing_counts[GAN_WUXING[g]] += 1
+    # 天干：五行计数与十神在同一趟循环里完成
+    wx = [0] * len(WUXING_ORDER)
+    ten_gods_gan = {}
+    for lbl, gid in zip(GAN_LABELS, p.gan_ids):
+        wx[GAN_WX_ID[gid]] += 1
+        ten_gods_gan[lbl] = gan_tg[gid]
 
+    # 地支藏干：五行增量与十神三元组均来自预计算表
     canggan_ten_gods: List[Tuple[str, str, str]] = []
-    for z in zhis:
-        for cg in ZHI_CANGGAN[z]:
-            wuxing_counts[GAN_WUXING[cg]] += 1
-            canggan_ten_gods.append((z, cg, ten_god(p.day_master, cg)))
-
-    labels = ["年干", "月干", "日干", "时干"]
-    ten_gods_gan = {}
-    for lbl, g in zip(labels, gans):
-        ten_gods_gan[lbl] = "日主" if g == p.day_master else ten_god(p.day_master, g)
+    for zid in p.zhi_ids:
+        canggan_ten_gods.extend(zhi_cg_tg[zid])
+        for w in ZHI_CG_WX_IDS[zid]:
+            wx[w] += 1
+    wuxing_counts = dict(zip(WUXING_ORDER, wx))
+
+    # 十神计数只在这里统计一次，eval_rules 与 _compute_risk_band 共用
+    gan_counter = Counter(tg for tg in ten_gods_gan.values() if tg != "日主")
+    cg_counter = Counter(tg for _, _, tg in canggan_ten_gods)
+    stabilizing = sum(gan_counter[t] + cg_counter[t] for t in STABILIZING_TEN_GODS)
+    tension = sum(gan_counter[t] + cg_counter[t] for t in TENSION_TEN_GODS)
 
     return {
         "wuxing_counts": wuxing_counts,
         "ten_gods_gan": ten_gods_gan,
-        "canggan_ten_gods": canggan_ten_gods
+        "canggan_ten_gods": canggan_ten_gods,
+        "ten_gods_gan_counts": gan_counter,
+        "canggan_ten_gods_counts": cg_counter,
+        "stabilizing_count": stabilizing,
+        "tension_count": tension,
     }
 
 
 # =========================
 # 3) 区间规则（banded rules）
 # =========================
+# 五行规则的固定字段：(元素, rule_id, title)
+WUXING_RULES = tuple((e, f"WUXING-{e}", f"{e}元素水平") for e in WUXING_ORDER)
+
+
 def _band_wuxing(count: int) -> str:
-    if count <= 2:
-        return "low"
-    elif count <= 4:
-        return "medium"
-    else:
-        return "high"
+    return WUXING_BAND[count]
 
 
 def _band_0_1_2_3plus(count: int) -> str:
-    if count == 0:
-        return "none"
-    elif count == 1:
-        return "low"
-    elif count == 2:
-        return "medium"
-    else:
-        return "high"
+    return BAND_0_1_2_3PLUS[count]
 
 
 def _band_0_1_2plus(count: int) -> str:
-    if count == 0:
-        return "none"
-    elif count == 1:
-        return "low"
-    else:
-        return "high"
+    return BAND_0_1_2PLUS[count]
+
+
+def wuxing_bands(features: Dict[str, Any]) -> Dict[str, str]:
+    """五行 -> band（与 eval_rules 中 WUXING-* 规则一致）"""
+    wux = features["wuxing_counts"]
+    return {e: _band_wuxing(int(wux.get(e, 0))) for e in WUXING_ORDER}
 
 
 def eval_rules(features: Dict[str, Any]) -> List[Dict[str, Any]]:
     hits: List[Dict[str, Any]] = []
 
     wux = features["wuxing_counts"]
-    ten_gans = features["ten_gods_gan"]
-    canggan = features["canggan_ten_gods"]
-
-    # 天干十神计数（不含日主）
-    tg_gan_counter: Dict[str, int] = {}
-    for pos, tg in ten_gans.items():
-        if tg == "日主":
-            continue
-        tg_gan_counter[tg] = tg_gan_counter.get(tg, 0) + 1
-
-    # 藏干十神计数
-    tg_cg_counter: Dict[str, int] = {}
-    for z, cg, tg in canggan:
-        tg_cg_counter[tg] = tg_cg_counter.get(tg, 0) + 1
+    tg_gan_counter = features["ten_gods_gan_counts"]      # 天干十神计数（不含日主）
+    tg_cg_counter = features["canggan_ten_gods_counts"]   # 藏干十神计数
 
     # 五行 band（五条必输出）
-    for e in ["木", "火", "土", "金", "水"]:
+    for e, rule_id, title in WUXING_RULES:
         cnt = int(wux.get(e, 0))
         band = _band_wuxing(cnt)
         hits.append({
-            "rule_id": f"WUXING-{e}",
-            "title": f"{e}元素水平",
+            "rule_id": rule_id,
+            "title": title,
             "message": band,
             "evidence": {"element": e, "count": cnt, "band": band}
         })
 
     # 天干十神 band 表
-    all_tg = ["比肩", "劫财", "食神", "伤官", "偏财", "正财", "七杀", "正官", "偏印", "正印"]
     band_table = {}
-    for tg in all_tg:
-        c = tg_gan_counter.get(tg, 0)
+    for tg in ALL_TEN_GODS:
+        c = tg_gan_counter[tg]
         band_table[tg] = {"count": c, "band": _band_0_1_2_3plus(c)}
     hits.append({
         "rule_id": "TEN-GOD-GANS",
@@ -182,10 +189,8 @@ def eval_rules(features: Dict[str, Any]) -> List[Dict[str, Any]]:
     })
 
     # 藏干十神 Top5
-    sorted_items = sorted(tg_cg_counter.items(), key=lambda x: x[1], reverse=True)
-    top_items = sorted_items[:5]
     out = []
-    for tg, c in top_items:
+    for tg, c in tg_cg_counter.most_common(5):
         out.append({"ten_god": tg, "count": c, "band": _band_0_1_2plus(c)})
 
     hits.append({
@@ -207,28 +212,13 @@ def _compute_risk_band(features: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
     band ∈ {"low", "medium", "high"}
     evidence 包含 stabilizing / tension 的计数。
     """
-    tg_gan = features["ten_gods_gan"]          # {'年干': '正官', ...}
-    canggan = features["canggan_ten_gods"]     # [('戌','戊','七杀'), ...]
-
-    # 统计所有十神出现次数（天干 + 藏干）
-    counter = Counter()
-    for pos, tg in tg_gan.items():
-        if tg != "日主":
-            counter[tg] += 1
-    for z, cg, tg in canggan:
-        counter[tg] += 1
-
-    # 稳定 / 支撑向十神
-    stabilizing_set = {"正印", "偏印", "比肩", "劫财"}
-    # 张力 / 压力向十神
-    tension_set = {"七杀", "正官", "食神", "伤官", "偏财", "正财"}
-
-    stabilizing = sum(counter[t] for t in stabilizing_set)
-    tension = sum(counter[t] for t in tension_set)
+    # 稳定 / 张力向十神计数（天干 + 藏干）已在 extract_features 中算好
+    stabilizing = features["stabilizing_count"]
+    tension = features["tension_count"]
 
     if tension <= stabilizing:
         band = "low"      # 风险整体可控
-    elif tension <= stabilizing + 2:
+    elif tension <= stabilizing + RISK_MEDIUM_MARGIN:
         band = "medium"   # 存在一定波动
     else:
         band = "high"     # 潜在波动较大
@@ -244,116 +234,179 @@ def _compute_risk_band(features: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
 # =========================
 # 5) 将结构结果翻译为“段落解释”
 # =========================
+OFFICER_SET = frozenset({"正官", "七杀"})
+SEAL_SET = frozenset({"正印", "偏印"})
+
+# 段落文本中固定的部分在导入时拼好，运行时只填入少量变量
+WX_DESC = {
+    (e, band): e + suffix
+    for e in WUXING_ORDER
+    for band, suffix in (("high", "偏旺"), ("medium", "中等"), ("low", "偏弱"))
+}
+
+# 段落 1：结构概览（按五行字填入描述）
+P1_TMPL = (
+    "从结构配置来看，该命式的五行分布大致呈现一个相对均衡的格局："
+    "木、火、土整体处于{木}、{火}与{土}的范围，"
+    "而金、水则表现为{金}与{水}。"
+    "这意味着在资源、行动与情绪流动之间，先天结构并未出现极端失衡的单一倾向。"
+)
+
+# 段落 2：日主与动力/制约
+P2_TMPL = (
+    "日主为{day_master}。就生成—制约关系而言，"
+    "整体生克链条并未呈现明显断裂，内部动能相对连贯；"
+    "同时，外在过度压制的信号并不突出。"
+    "在这种情形下，命式中的风险更多来自于如何管理自身的内在张力与取舍，"
+    "而非单一外在环境的强力打击。"
+)
+
+# 段落 3：天干十神（规范/资源）
+P3_NORM_TMPL = (
+    "天干层面显示出一定的制度化指向："
+    "{norm}"
+    "在关键位置出现，"
+    "使得此命式在面对秩序、资格、名分或“可被承认的路径”时更为敏感，"
+    "也更在意是否获得来自体制或权威的认可。"
+)
+P3_NONE = (
+    "天干层面未呈现出特别集中的制度化星曜（如官杀或印星的明显聚集），"
+    "其对规范与正当性的关注相对不那么突出，更依赖具体情境与个人选择来显化。"
+)
+
+# 段落 4：潜在张力（藏干）
+P4 = (
+    "藏干通常被视为命式中的“隐性机制”。就本命式而言，"
+    "多重藏干的重复与组合，预示着在规范与行动、稳定与竞争之间，"
+    "存在一个可调节的张力区间。"
+    "这一张力并非必然走向失衡，而是提示在不同阶段与场景中，"
+    "有机会通过策略性选择来重新配置风险与机遇。"
+)
+
+# 段落 5：吉凶总结（非决定论，带计算），按风险档位整段预先拼好
+RISK_SENTENCES = {
+    "low": (
+        "整体偏向“中上格局”，吉性力量相对充足且分布均衡，"
+        "凶性因素虽存在但未形成压倒性结构，在当前配置下属于“风险可控”的类型。"
+    ),
+    "medium": (
+        "结构上呈现“中等偏稳”的格局，吉性与凶性力量之间存在一定拉锯，"
+        "在日常情境下多能维持基本稳定；但在关键抉择或高压阶段，"
+        "若相关张力未被妥善调节，则更容易显化为起伏与波动。"
+    ),
+    "high": (
+        "整体结构显示张力因素相对突出，吉性资源虽在但承压较大，"
+        "若欠缺足够的支持系统或自我调节机制，在关键阶段较易表现为不稳定与风险聚集。"
+    ),
+}
+P5_BY_BAND = {
+    band: (
+        "综合五行区间、十神结构与隐性张力的计算结果，本命式在结构上可以概括为："
+        + risk_sentence +
+        "需要强调的是，这里的“吉/凶”并非对具体事件的直接预测，"
+        "而是对结构条件的分析：当制度化资源与内部一致性能够被良好调度时，"
+        "系统更可能呈现正向发展；反之，若隐性张力在关键情境下被放大，"
+        "则相应的风险水平也会随之上升。"
+    )
+    for band, risk_sentence in RISK_SENTENCES.items()
+}
+
+
 def generate_interpretation_text(
     pillars: Pillars,
     features: Dict[str, Any],
     rule_hits: List[Dict[str, Any]]
 ) -> str:
-    wx = features["wuxing_counts"]
     tg_gan = features["ten_gods_gan"]
+    present = frozenset(tg_gan.values())
 
-    # 从 rule_hits 里读取五行 band
-    band_map = {}
-    for h in rule_hits:
-        if h.get("rule_id", "").startswith("WUXING-"):
-            e = h["evidence"]["element"]
-            band_map[e] = h["evidence"]["band"]
-
-    def _wx_desc(e: str) -> str:
-        band = band_map.get(e, "medium")
-        if band == "high":
-            return f"{e}偏旺"
-        if band == "low":
-            return f"{e}偏弱"
-        return f"{e}中等"
-
-    # 段落 1：结构概览
-    p1 = (
-        "从结构配置来看，该命式的五行分布大致呈现一个相对均衡的格局："
-        f"木、火、土整体处于{_wx_desc('木')}、{_wx_desc('火')}与{_wx_desc('土')}的范围，"
-        f"而金、水则表现为{_wx_desc('金')}与{_wx_desc('水')}。"
-        "这意味着在资源、行动与情绪流动之间，先天结构并未出现极端失衡的单一倾向。"
-    )
+    # 五行 band 直接由 features 得出，无需扫描 rule_hits
+    band_map = wuxing_bands(features)
+    p1 = P1_TMPL.format_map({e: WX_DESC[(e, band)] for e, band in band_map.items()})
 
-    # 段落 2：日主与动力/制约
-    p2 = (
-        f"日主为{pillars.day_master}。就生成—制约关系而言，"
-        "整体生克链条并未呈现明显断裂，内部动能相对连贯；"
-        "同时，外在过度压制的信号并不突出。"
-        "在这种情形下，命式中的风险更多来自于如何管理自身的内在张力与取舍，"
-        "而非单一外在环境的强力打击。"
-    )
+    p2 = P2_TMPL.format(day_master=pillars.day_master)
 
-    # 段落 3：天干十神（规范/资源）
     norm_bits = []
-    if "正官" in tg_gan.values() or "七杀" in tg_gan.values():
+    if present & OFFICER_SET:
         norm_bits.append("权威/规范维度（官杀）")
-    if "正印" in tg_gan.values() or "偏印" in tg_gan.values():
+    if present & SEAL_SET:
         norm_bits.append("知识/正当性维度（印星）")
+    p3 = P3_NORM_TMPL.format(norm="与".join(norm_bits)) if norm_bits else P3_NONE
 
-    if norm_bits:
-        p3 = (
-            "天干层面显示出一定的制度化指向："
-            + "与".join(norm_bits) +
-            "在关键位置出现，"
-            "使得此命式在面对秩序、资格、名分或“可被承认的路径”时更为敏感，"
-            "也更在意是否获得来自体制或权威的认可。"
-        )
-    else:
-        p3 = (
-            "天干层面未呈现出特别集中的制度化星曜（如官杀或印星的明显聚集），"
-            "其对规范与正当性的关注相对不那么突出，更依赖具体情境与个人选择来显化。"
-        )
-
-    # 段落 4：潜在张力（藏干）
-    p4 = (
-        "藏干通常被视为命式中的“隐性机制”。就本命式而言，"
-        "多重藏干的重复与组合，预示着在规范与行动、稳定与竞争之间，"
-        "存在一个可调节的张力区间。"
-        "这一张力并非必然走向失衡，而是提示在不同阶段与场景中，"
-        "有机会通过策略性选择来重新配置风险与机遇。"
-    )
-
-    # 段落 5：吉凶总结（非决定论，带计算）
     band, risk_ev = _compute_risk_band(features)
-    if band == "low":
-        risk_sentence = (
-            "整体偏向“中上格局”，吉性力量相对充足且分布均衡，"
-            "凶性因素虽存在但未形成压倒性结构，在当前配置下属于“风险可控”的类型。"
-        )
-    elif band == "medium":
-        risk_sentence = (
-            "结构上呈现“中等偏稳”的格局，吉性与凶性力量之间存在一定拉锯，"
-            "在日常情境下多能维持基本稳定；但在关键抉择或高压阶段，"
-            "若相关张力未被妥善调节，则更容易显化为起伏与波动。"
-        )
-    else:  # "high"
-        risk_sentence = (
-            "整体结构显示张力因素相对突出，吉性资源虽在但承压较大，"
-            "若欠缺足够的支持系统或自我调节机制，在关键阶段较易表现为不稳定与风险聚集。"
-        )
-
-    p5 = (
-        "综合五行区间、十神结构与隐性张力的计算结果，本命式在结构上可以概括为："
-        + risk_sentence +
-        "需要强调的是，这里的“吉/凶”并非对具体事件的直接预测，"
-        "而是对结构条件的分析：当制度化资源与内部一致性能够被良好调度时，"
-        "系统更可能呈现正向发展；反之，若隐性张力在关键情境下被放大，"
-        "则相应的风险水平也会随之上升。"
-    )
+    p5 = P5_BY_BAND[band]
 
-    return "\n\n".join([p1, p2, p3, p4, p5])
+    return "\n\n".join([p1, p2, p3, P4, p5])
 
 
 # =========================
-# 6) Streamlit UI（主输出：段落解释）
+# 6) 完整流水线（按输入缓存）
 # =========================
-st.set_page_config(page_title="Bazi Algorithmic Model Demo", layout="wide")
-st.title("Bazi Algorithmic Religious Knowledge System — Demo")
+@st.cache_resource(show_spinner=False)
+def get_zi(name: str) -> tzinfo:
+    from zoneinfo import ZoneInfo
 
-col1, col2 = st.columns([1, 1])
+    return ZoneInfo(name)
 
-with col1:
+
+def localize(birth_date: _date, birth_time: _time, tz: tzinfo) -> datetime:
+    """
+    按 pytz localize(is_dst=False) 的规则取偏移：
+    回拨造成的重复时刻优先取非夏令时一侧，两侧同为（非）夏令时则取后一次；
+    拨快跳过的时刻沿用跳变前的偏移（即 fold=0）。
+    """
+    dt0 = datetime.combine(birth_date, birth_time, tzinfo=tz)
+    dt1 = dt0.replace(fold=1)
+    if dt0.utcoffset() > dt1.utcoffset() and not (dt1.dst() and not dt0.dst()):
+        return dt1
+    return dt0
+
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def compute_result(
+    tz_name: str,
+    birth_date: _date,
+    birth_time: _time
+) -> Tuple[str, bytes]:
+    """
+    返回 (interpretation_text, result_json)
+    result_json 为 UTF-8 JSON 字节串，只序列化一次，展示与下载共用。
+    """
+    dt_local = localize(birth_date, birth_time, get_zi(tz_name))
+
+    pillars = get_pillars(
+        dt_local.year, dt_local.month, dt_local.day,
+        dt_local.hour, dt_local.minute, dt_local.second
+    )
+    features = extract_features(pillars)
+    rule_hits = eval_rules(features)
+
+    result = {
+        "input": {"datetime_local": dt_local.isoformat(), "timezone": tz_name},
+        "pillars": {
+            "year": pillars.year_gz,
+            "month": pillars.month_gz,
+            "day": pillars.day_gz,
+            "hour": pillars.hour_gz,
+            "day_master": pillars.day_master
+        },
+        "features": {k: features[k] for k in EXPORTED_FEATURE_KEYS},
+        "rule_hits": rule_hits
+    }
+    interpretation_text = generate_interpretation_text(pillars, features, rule_hits)
+    if orjson is not None:
+        result_json = orjson.dumps(result, option=orjson.OPT_INDENT_2)
+    else:
+        result_json = json.dumps(result, ensure_ascii=False, indent=2).encode("utf-8")
+    return interpretation_text, result_json
+
+
+# =========================
+# 7) Streamlit UI（主输出：段落解释）
+# =========================
+# 输入区与说明区是普通函数而非 fragment：Run 按钮必须触发整页重跑，
+# 输出区才能读到新的输入；无控件的 fragment 在整页重跑时同样会重新执行。
+def render_inputs() -> Tuple[str, _date, _time, bool]:
     tz_name = st.selectbox(
         "Time zone",
         ["Asia/Kuala_Lumpur", "Asia/Shanghai", "UTC"],
@@ -373,8 +426,10 @@ with col1:
     )
 
     run = st.button("Run model")
+    return tz_name, birth_date, birth_time, run
 
-with col2:
+
+def render_about() -> None:
     st.markdown("### What this demo does")
     st.write(
         "Input a birth datetime → compute Four Pillars → extract interpretable features "
@@ -385,40 +440,42 @@ with col2:
         "not a deterministic prediction."
     )
 
-if run:
-    tz = pytz.timezone(tz_name)
-    dt_local = tz.localize(datetime.combine(birth_date, birth_time))
-
-    pillars = get_pillars(dt_local)
-    features = extract_features(pillars)
-    rule_hits = eval_rules(features)
-
-    result = {
-        "input": {"datetime_local": dt_local.isoformat(), "timezone": tz_name},
-        "pillars": {
-            "year": pillars.year_gz,
-            "month": pillars.month_gz,
-            "day": pillars.day_gz,
-            "hour": pillars.hour_gz,
-            "day_master": pillars.day_master
-        },
-        "features": features,
-        "rule_hits": rule_hits
-    }
 
+# 输出区作为 fragment：其内部控件（如下载按钮）只触发本区重跑，
+# 不会重跑整个脚本。
+@st.fragment
+def render_result(interpretation_text: str, result_json: bytes) -> None:
     st.subheader("Interpretation")
-    interpretation_text = generate_interpretation_text(pillars, features, rule_hits)
     st.markdown(interpretation_text)
 
     with st.expander("Show computational details (Four Pillars / Features / Rules)"):
-        st.json(result, expanded=True)
+        # 传入已编码的 JSON 文本，st.json 不再对 dict 重新序列化
+        st.json(result_json.decode("utf-8"), expanded=True)
 
     st.subheader("Download JSON output")
     st.download_button(
         label="Download result.json",
-        data=json.dumps(result, ensure_ascii=False, indent=2).encode("utf-8"),
+        data=result_json,
         file_name="result.json",
         mime="application/json"
     )
 
 
+st.title("Bazi Algorithmic Religious Knowledge System — Demo")
+
+col1, col2 = st.columns([1, 1])
+
+with col1:
+    tz_name, birth_date, birth_time, run = render_inputs()
+
+with col2:
+    render_about()
+
+# 上次 Run 的输入与输出存于 session_state：输入未变的重跑直接复用，不再走流水线
+input_key = (tz_name, birth_date, birth_time)
+if run:
+    st.session_state["last_key"] = input_key
+    st.session_state["last_output"] = compute_result(tz_name, birth_date, birth_time)
+
+if st.session_state.get("last_key") == input_key:
+    render_result(*st.session_state["last_output"])
@@ -0,0 +1,148 @@
+"""
+批量评估内核（离线校准用）：把 extract_features + eval_rules 的区间结果
+改写为整数数组上的循环，可由 numba 编译并按出生记录并行。
+Streamlit 单次查询仍走 app.py 的纯 Python 路径。
+"""
+from typing import Iterable, Tuple
+
+import numpy as np
+
+from bazi_tables import (
+    ALL_TEN_GODS, BAND_0_1_2_3PLUS, BAND_0_1_2PLUS, GAN_CHARS, GAN_ID, GAN_WUXING,
+    RISK_MEDIUM_MARGIN, STABILIZING_TEN_GODS, TEN_GOD_TABLE, TENSION_TEN_GODS,
+    WUXING_BAND, WUXING_ORDER, ZHI_CANGGAN, ZHI_CHARS, ZHI_ID,
+)
+
+try:
+    from numba import njit, prange
+except ImportError:  # 未安装 numba 时退化为普通 Python 循环
+    prange = range
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+
+# =========================
+# 1) 整数编码
+# =========================
+# 领域常量全部取自 bazi_tables（与 app.py 同源），此处只转成 int8 数组
+TEN_GOD_NAMES = ALL_TEN_GODS
+
+# 天干 -> 五行编号（WUXING_ORDER 下标）
+GAN_WX_ARR = np.array([WUXING_ORDER.index(GAN_WUXING[g]) for g in GAN_CHARS], dtype=np.int8)
+
+# 地支藏干扁平存放：第 z 个地支的藏干为 ZHI_CG_FLAT[ZHI_CG_OFF[z]:ZHI_CG_OFF[z + 1]]
+ZHI_CG_FLAT = np.array([GAN_ID[cg] for z in ZHI_CHARS for cg in ZHI_CANGGAN[z]], dtype=np.int8)
+ZHI_CG_OFF = np.cumsum([0] + [len(ZHI_CANGGAN[z]) for z in ZHI_CHARS]).astype(np.int8)
+
+# TEN_GOD_ARR[dm, og] -> TEN_GOD_NAMES 下标
+TEN_GOD_ARR = np.array(
+    [[ALL_TEN_GODS.index(TEN_GOD_TABLE[(dm, og)]) for og in GAN_CHARS] for dm in GAN_CHARS],
+    dtype=np.int8,
+)
+
+# 各 band 表转为编号（下标即计数），取值含义见下方输出布局
+WUXING_BAND_ARR = np.array([("low", "medium", "high").index(x) for x in WUXING_BAND], dtype=np.int8)
+TG_GAN_BAND_ARR = np.array(
+    [("none", "low", "medium", "high").index(x) for x in BAND_0_1_2_3PLUS], dtype=np.int8
+)
+TG_CG_BAND_ARR = np.array([("none", "low", "high").index(x) for x in BAND_0_1_2PLUS], dtype=np.int8)
+
+# 十神方向：1 稳定向 / -1 张力向（TEN_GOD_NAMES 下标）
+TG_SIDE_ARR = np.array(
+    [1 if t in STABILIZING_TEN_GODS else -1 if t in TENSION_TEN_GODS else 0 for t in ALL_TEN_GODS],
+    dtype=np.int8,
+)
+
+
+# =========================
+# 2) 输出布局
+# =========================
+# out_bands 每行：五行 band(5) | 天干十神 band(10) | 藏干十神 band(10) | 结构风险 band(1)
+#   五行：0 low / 1 medium / 2 high
+#   天干十神：0 none / 1 low / 2 medium / 3 high
+#   藏干十神：0 none / 1 low / 2 high
+#   结构风险：0 low / 1 medium / 2 high
+COL_WUXING = 0
+COL_TG_GAN = 5
+COL_TG_CG = 15
+COL_RISK = 25
+N_COLS = 26
+
+
+def encode_ganzhi(rows: Iterable[Tuple[str, str, str, str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """(年柱, 月柱, 日柱, 时柱) 干支串 -> (stems, branches)，均为 int8[N, 4]"""
+    rows = list(rows)
+    stems = np.empty((len(rows), 4), dtype=np.int8)
+    branches = np.empty((len(rows), 4), dtype=np.int8)
+    for b, gz in enumerate(rows):
+        for k in range(4):
+            stems[b, k] = GAN_ID[gz[k][0]]
+            branches[b, k] = ZHI_ID[gz[k][1]]
+    return stems, branches
+
+
+# =========================
+# 3) 内核
+# =========================
+@njit(cache=True, parallel=True)
+def batch_eval(stems, branches, out_bands, zhi_cg_flat, zhi_cg_off, gan_wx, ten_god,
+               wuxing_band, tg_gan_band, tg_cg_band, tg_side, risk_margin):
+    """
+    stems / branches: int8[N, 4]（日柱在下标 2）
+    out_bands: int8[N, N_COLS]，逐行写入区间结果
+    其余参数依次为 ZHI_CG_FLAT / ZHI_CG_OFF / GAN_WX_ARR / TEN_GOD_ARR /
+    WUXING_BAND_ARR / TG_GAN_BAND_ARR / TG_CG_BAND_ARR / TG_SIDE_ARR / RISK_MEDIUM_MARGIN。
+    表一律经参数传入：cache=True 的编译缓存只随本文件失效，
+    若读取 bazi_tables 的全局值，改表后会沿用旧缓存里冻结的常量。
+    """
+    for b in prange(stems.shape[0]):
+        # 计数直接在扁平藏干表上逐行累加，不经由子函数与行视图
+        wx = np.zeros(5, np.int32)
+        tg_gan = np.zeros(10, np.int32)
+        tg_cg = np.zeros(10, np.int32)
+        dm = stems[b, 2]
+        for k in range(4):
+            g = stems[b, k]
+            wx[gan_wx[g]] += 1
+            if g != dm:
+                tg_gan[ten_god[dm, g]] += 1
+            z = branches[b, k]
+            for j in range(zhi_cg_off[z], zhi_cg_off[z + 1]):
+                cg = zhi_cg_flat[j]
+                wx[gan_wx[cg]] += 1
+                tg_cg[ten_god[dm, cg]] += 1
+
+        for e in range(5):
+            out_bands[b, COL_WUXING + e] = wuxing_band[wx[e]]
+
+        stabilizing = 0
+        tension = 0
+        for t in range(10):
+            c = tg_gan[t]
+            out_bands[b, COL_TG_GAN + t] = tg_gan_band[c]
+            c2 = tg_cg[t]
+            out_bands[b, COL_TG_CG + t] = tg_cg_band[c2]
+            if tg_side[t] > 0:
+                stabilizing += c + c2
+            elif tg_side[t] < 0:
+                tension += c + c2
+
+        if tension <= stabilizing:
+            out_bands[b, COL_RISK] = 0
+        elif tension <= stabilizing + risk_margin:
+            out_bands[b, COL_RISK] = 1
+        else:
+            out_bands[b, COL_RISK] = 2
+
+
+def run_batch(stems: np.ndarray, branches: np.ndarray) -> np.ndarray:
+    out = np.empty((stems.shape[0], N_COLS), dtype=np.int8)
+    batch_eval(np.ascontiguousarray(stems, dtype=np.int8),
+               np.ascontiguousarray(branches, dtype=np.int8),
+               out, ZHI_CG_FLAT, ZHI_CG_OFF, GAN_WX_ARR, TEN_GOD_ARR,
+               WUXING_BAND_ARR, TG_GAN_BAND_ARR, TG_CG_BAND_ARR, TG_SIDE_ARR,
+               RISK_MEDIUM_MARGIN)
+    return out
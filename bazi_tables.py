@@ -0,0 +1,96 @@
+"""
+干支、十神与区间阈值的领域常量。
+app.py（单次查询）与 bazi_kernel.py（批量内核）都从这里取表，两边不各自维护副本。
+本模块不依赖 Streamlit / numpy，可被任一方单独导入。
+"""
+import sys
+from typing import Any, Dict, Tuple
+
+
+def _interned(d: Dict[str, Any]) -> Dict[str, Any]:
+    # 干支单字驻留；GAN_CHARS / ZHI_CHARS 取自这些键，编号转回汉字时复用同一对象
+    return {sys.intern(k): v for k, v in d.items()}
+
+
+# =========================
+# 1) 天干 / 地支 / 五行
+# =========================
+# 天干 -> (五行, 阴阳)，_ten_god_compute 一次查表即可取得两项
+GAN_INFO: Dict[str, Tuple[str, str]] = _interned({
+    "甲": ("木", "阳"), "乙": ("木", "阴"),
+    "丙": ("火", "阳"), "丁": ("火", "阴"),
+    "戊": ("土", "阳"), "己": ("土", "阴"),
+    "庚": ("金", "阳"), "辛": ("金", "阴"),
+    "壬": ("水", "阳"), "癸": ("水", "阴"),
+})
+GAN_WUXING = {g: wx for g, (wx, _) in GAN_INFO.items()}
+SHENG = {"木": "火", "火": "土", "土": "金", "金": "水", "水": "木"}
+KE    = {"木": "土", "土": "水", "水": "火", "火": "金", "金": "木"}
+
+ZHI_CANGGAN = _interned({
+    "子": ("癸",), "丑": ("己", "癸", "辛"), "寅": ("甲", "丙", "戊"), "卯": ("乙",),
+    "辰": ("戊", "乙", "癸"), "巳": ("丙", "戊", "庚"), "午": ("丁", "己"),
+    "未": ("己", "丁", "乙"), "申": ("庚", "壬", "戊"), "酉": ("辛",),
+    "戌": ("戊", "辛", "丁"), "亥": ("壬", "甲"),
+})
+
+# 天干 / 地支的整数编号（0–9 / 0–11），热路径上以编号代替汉字键；
+# 编号转回汉字时取 GAN_CHARS / ZHI_CHARS 中已驻留的字符
+GAN_CHARS = tuple(GAN_INFO)
+ZHI_CHARS = tuple(ZHI_CANGGAN)
+GAN_ID = {g: i for i, g in enumerate(GAN_CHARS)}
+ZHI_ID = {z: i for i, z in enumerate(ZHI_CHARS)}
+
+WUXING_ORDER = ("木", "火", "土", "金", "水")
+
+
+# =========================
+# 2) 十神
+# =========================
+ALL_TEN_GODS = ("比肩", "劫财", "食神", "伤官", "偏财", "正财", "七杀", "正官", "偏印", "正印")
+
+
+def _ten_god_compute(day_master: str, other_gan: str) -> str:
+    dm_wx, dm_yy = GAN_INFO[day_master]
+    ot_wx, ot_yy = GAN_INFO[other_gan]
+    same_polar = (dm_yy == ot_yy)
+
+    if ot_wx == dm_wx:
+        return "比肩" if same_polar else "劫财"
+    if SHENG[dm_wx] == ot_wx:
+        return "食神" if same_polar else "伤官"
+    if KE[dm_wx] == ot_wx:
+        return "偏财" if same_polar else "正财"
+    if KE[ot_wx] == dm_wx:
+        return "七杀" if same_polar else "正官"
+    if SHENG[ot_wx] == dm_wx:
+        return "偏印" if same_polar else "正印"
+    return "未知"
+
+
+# 天干只有 10 个，十神关系在导入时一次性打表（100 项）
+TEN_GOD_TABLE: Dict[Tuple[str, str], str] = {
+    (dm, og): _ten_god_compute(dm, og) for dm in GAN_CHARS for og in GAN_CHARS
+}
+
+# 稳定 / 支撑向十神
+STABILIZING_TEN_GODS = frozenset({"正印", "偏印", "比肩", "劫财"})
+# 张力 / 压力向十神
+TENSION_TEN_GODS = frozenset({"七杀", "正官", "食神", "伤官", "偏财", "正财"})
+
+
+# =========================
+# 3) 区间阈值
+# =========================
+# 计数上限：4 个天干 + 4 个地支各至多 3 个藏干
+MAX_COUNT = 4 + 4 * 3
+
+# 各 band 按计数直接查表（下标即计数）
+WUXING_BAND = tuple(
+    "low" if c <= 2 else "medium" if c <= 4 else "high" for c in range(MAX_COUNT + 1)
+)
+BAND_0_1_2_3PLUS = ("none", "low", "medium") + ("high",) * (MAX_COUNT - 2)
+BAND_0_1_2PLUS = ("none", "low") + ("high",) * (MAX_COUNT - 1)
+
+# 结构风险：tension ≤ stabilizing 为 low，再多出至多 RISK_MEDIUM_MARGIN 为 medium，其余 high
+RISK_MEDIUM_MARGIN = 2